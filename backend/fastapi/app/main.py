@@ -1,6 +1,8 @@
 import os
 import uuid
-from typing import Optional
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import orjson
 from fastapi import FastAPI, Depends, Header, HTTPException
 from sqlalchemy import text
 from .db import engine, session
@@ -17,6 +19,134 @@ def require_api_key(x_api_key: Optional[str] = Header(default=None)):
     if API_KEY and x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Invalid API key")
 
+
+# -------- batched upserts --------
+
+UPSERT_BATCH_SIZE = 1000
+
+_NODE_COLUMNS = ("id", "node_type", "name", "parent_id", "slug", "chunk_id", "attrs")
+_LINK_COLUMNS = ("id", "src_id", "dst_id", "link_type", "weight", "attrs")
+
+_NODES_ON_CONFLICT = """
+    ON CONFLICT (id) DO UPDATE SET
+      node_type = EXCLUDED.node_type,
+      name = EXCLUDED.name,
+      parent_id = EXCLUDED.parent_id,
+      slug = EXCLUDED.slug,
+      chunk_id = EXCLUDED.chunk_id,
+      attrs = EXCLUDED.attrs,
+      updated_at = NOW()
+"""
+
+_LINKS_ON_CONFLICT = """
+    ON CONFLICT (id) DO UPDATE SET
+      src_id = EXCLUDED.src_id,
+      dst_id = EXCLUDED.dst_id,
+      link_type = EXCLUDED.link_type,
+      weight = EXCLUDED.weight,
+      attrs = EXCLUDED.attrs
+"""
+
+_UPSERT_NODES_SQL = text(
+    """
+    INSERT INTO nodes (id, node_type, name, parent_id, slug, chunk_id, attrs)
+    SELECT * FROM UNNEST(
+      CAST(:ids AS uuid[]),
+      CAST(:node_types AS text[]),
+      CAST(:names AS text[]),
+      CAST(:parent_ids AS uuid[]),
+      CAST(:slugs AS text[]),
+      CAST(:chunk_ids AS text[]),
+      CAST(:attrs AS jsonb[])
+    ) AS t(id, node_type, name, parent_id, slug, chunk_id, attrs)
+    """ + _NODES_ON_CONFLICT
+)
+
+_UPSERT_LINKS_SQL = text(
+    """
+    INSERT INTO links (id, src_id, dst_id, link_type, weight, attrs)
+    SELECT * FROM UNNEST(
+      CAST(:ids AS uuid[]),
+      CAST(:src_ids AS uuid[]),
+      CAST(:dst_ids AS uuid[]),
+      CAST(:link_types AS text[]),
+      CAST(:weights AS real[]),
+      CAST(:attrs AS jsonb[])
+    ) AS t(id, src_id, dst_id, link_type, weight, attrs)
+    """ + _LINKS_ON_CONFLICT
+)
+
+
+def _dump_json(obj: Any) -> str:
+    # jsonb parameters are sent pre-serialized; orjson is much faster than json.dumps
+    return orjson.dumps(obj).decode()
+
+
+def _unique_by_id(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement:
+    # collapse duplicate ids (last one wins, as with row-by-row upserts) while
+    # keeping first-seen order so parents are still written before children.
+    return list({r["id"]: r for r in rows}.values())
+
+
+def _batches(rows: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    it = iter(_unique_by_id(rows))
+    while batch := list(islice(it, UPSERT_BATCH_SIZE)):
+        yield batch
+
+
+def _upsert_nodes(conn, nodes: Iterable[Dict[str, Any]]) -> None:
+    for batch in _batches(nodes):
+        conn.execute(_UPSERT_NODES_SQL, {
+            "ids": [n["id"] for n in batch],
+            "node_types": [n["node_type"] for n in batch],
+            "names": [n["name"] for n in batch],
+            "parent_ids": [n["parent_id"] for n in batch],
+            "slugs": [n["slug"] for n in batch],
+            "chunk_ids": [n["chunk_id"] for n in batch],
+            "attrs": [_dump_json(n["attrs"]) for n in batch],
+        })
+
+
+def _upsert_links(conn, links: Iterable[Dict[str, Any]]) -> None:
+    for batch in _batches(links):
+        conn.execute(_UPSERT_LINKS_SQL, {
+            "ids": [l["id"] for l in batch],
+            "src_ids": [l["src_id"] for l in batch],
+            "dst_ids": [l["dst_id"] for l in batch],
+            "link_types": [l["link_type"] for l in batch],
+            "weights": [l["weight"] for l in batch],
+            "attrs": [_dump_json(l["attrs"] or {}) for l in batch],
+        })
+
+
+def _copy_upsert(conn, table: str, columns: Tuple[str, ...], on_conflict: str, rows: Iterable[Tuple[Any, ...]]) -> None:
+    # Stream rows into a transaction-scoped temp table with COPY (psycopg v3),
+    # then merge them into the real table with a single INSERT ... ON CONFLICT.
+    tmp = f"_tmp_{table}"
+    cols = ", ".join(columns)
+    conn.execute(text(f"CREATE TEMP TABLE {tmp} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    with conn.connection.driver_connection.cursor() as cur:
+        with cur.copy(f"COPY {tmp} ({cols}) FROM STDIN") as cp:
+            for row in rows:
+                cp.write_row(row)
+    conn.execute(text(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {tmp}" + on_conflict))
+
+
+def _copy_nodes(conn, nodes: Iterable[Dict[str, Any]]) -> None:
+    _copy_upsert(conn, "nodes", _NODE_COLUMNS, _NODES_ON_CONFLICT, (
+        (n["id"], n["node_type"], n["name"], n["parent_id"], n["slug"], n["chunk_id"], _dump_json(n["attrs"]))
+        for n in _unique_by_id(nodes)
+    ))
+
+
+def _copy_links(conn, links: Iterable[Dict[str, Any]]) -> None:
+    _copy_upsert(conn, "links", _LINK_COLUMNS, _LINKS_ON_CONFLICT, (
+        (l["id"], l["src_id"], l["dst_id"], l["link_type"], l["weight"], _dump_json(l["attrs"] or {}))
+        for l in _unique_by_id(links)
+    ))
+
+
 @app.get("/health")
 def health():
     return {"ok": True}
@@ -24,100 +154,31 @@ def health():
 @app.post("/api/bulk_upsert", dependencies=[Depends(require_api_key)])
 def bulk_upsert(payload: BulkUpsertIn):
     with session() as conn:
-        for n in payload.nodes:
-            conn.execute(text(
-                """
-                INSERT INTO nodes (id, node_type, name, parent_id, slug, chunk_id, attrs)
-                VALUES (:id::uuid, :node_type, :name, :parent_id::uuid, :slug, :chunk_id, :attrs::jsonb)
-                ON CONFLICT (id) DO UPDATE SET
-                  node_type = EXCLUDED.node_type,
-                  name = EXCLUDED.name,
-                  parent_id = EXCLUDED.parent_id,
-                  slug = EXCLUDED.slug,
-                  chunk_id = EXCLUDED.chunk_id,
-                  attrs = EXCLUDED.attrs,
-                  updated_at = NOW()
-                """
-            ), {
-                "id": n.id,
-                "node_type": n.node_type,
-                "name": n.name,
-                "parent_id": n.parent_id,
-                "slug": n.slug,
-                "chunk_id": n.chunk_id,
-                "attrs": n.attrs,
-            })
-        for l in payload.links:
-            conn.execute(text(
-                """
-                INSERT INTO links (id, src_id, dst_id, link_type, weight, attrs)
-                VALUES (:id::uuid, :src_id::uuid, :dst_id::uuid, :link_type, :weight, :attrs::jsonb)
-                ON CONFLICT (id) DO UPDATE SET
-                  src_id = EXCLUDED.src_id,
-                  dst_id = EXCLUDED.dst_id,
-                  link_type = EXCLUDED.link_type,
-                  weight = EXCLUDED.weight,
-                  attrs = EXCLUDED.attrs
-                """
-            ), {
-                "id": l.id,
-                "src_id": l.src_id,
-                "dst_id": l.dst_id,
-                "link_type": l.link_type,
-                "weight": l.weight,
-                "attrs": l.attrs,
-            })
+        _upsert_nodes(conn, [n.model_dump() for n in payload.nodes])
+        _upsert_links(conn, [l.model_dump() for l in payload.links])
     return {"inserted": len(payload.nodes) + len(payload.links)}
 
 @app.post("/api/generate/chunk", response_model=GenerateChunkOut, dependencies=[Depends(require_api_key)])
 def api_generate_chunk(body: GenerateChunkIn):
     result = generate_chunk(config_path=STEAMPUNK_CONFIG_PATH, seed=body.seed, scope_type=body.scope_type, scope_node_id=body.scope_node_id)
     with session() as conn:
-        # ensure chunk row
+        _copy_nodes(conn, result["nodes"])
+        _copy_links(conn, result["links"])
+        # chunk row last: scope_node_id references a node written above.
+        # Validation is a simple pass for now, so the row goes straight to 'validated'.
         conn.execute(text(
             """
             INSERT INTO chunks (chunk_id, scope_type, scope_node_id, status, attrs)
-            VALUES (:chunk_id, :scope_type, :scope_node_id::uuid, 'generated', :attrs::jsonb)
+            VALUES (:chunk_id, :scope_type, CAST(:scope_node_id AS uuid), 'validated', CAST(:attrs AS jsonb))
             ON CONFLICT (chunk_id)
-            DO UPDATE SET status = 'generated', attrs = EXCLUDED.attrs, updated_at = NOW()
+            DO UPDATE SET status = 'validated', attrs = EXCLUDED.attrs, updated_at = NOW()
             """
         ), {
             "chunk_id": result["chunk_id"],
             "scope_type": body.scope_type,
             "scope_node_id": result["scope_node_id"],
-            "attrs": {"seed": body.seed}
+            "attrs": _dump_json({"seed": body.seed}),
         })
-        # upsert nodes
-        for n in result["nodes"]:
-            conn.execute(text(
-                """
-                INSERT INTO nodes (id, node_type, name, parent_id, slug, chunk_id, attrs)
-                VALUES (:id::uuid, :node_type, :name, :parent_id::uuid, :slug, :chunk_id, :attrs::jsonb)
-                ON CONFLICT (id) DO UPDATE SET
-                  node_type = EXCLUDED.node_type,
-                  name = EXCLUDED.name,
-                  parent_id = EXCLUDED.parent_id,
-                  slug = EXCLUDED.slug,
-                  chunk_id = EXCLUDED.chunk_id,
-                  attrs = EXCLUDED.attrs,
-                  updated_at = NOW()
-                """
-            ), n)
-        for l in result["links"]:
-            conn.execute(text(
-                """
-                INSERT INTO links (id, src_id, dst_id, link_type, weight, attrs)
-                VALUES (:id::uuid, :src_id::uuid, :dst_id::uuid, :link_type, :weight, :attrs::jsonb)
-                ON CONFLICT (id) DO UPDATE SET
-                  src_id = EXCLUDED.src_id,
-                  dst_id = EXCLUDED.dst_id,
-                  link_type = EXCLUDED.link_type,
-                  weight = EXCLUDED.weight,
-                  attrs = EXCLUDED.attrs
-                """
-            ), l)
-        # mark validated (simple pass)
-        conn.execute(text("UPDATE chunks SET status='validated', updated_at=NOW() WHERE chunk_id=:cid"), {"cid": result["chunk_id"]})
     return GenerateChunkOut(chunk_id=result["chunk_id"], nodes_count=len(result["nodes"]), links_count=len(result["links"]) )
 
 @app.get("/api/chunks/{chunk_id}/stats", response_model=ChunkStats, dependencies=[Depends(require_api_key)])
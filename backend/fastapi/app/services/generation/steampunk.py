@@ -5,28 +5,55 @@ import uuid
 import math
 import random
 import hashlib
-from typing import Any, Dict, List, Tuple, Optional
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, Dict, List, Set, Tuple, Optional
 from pathlib import Path
 import yaml
 
 # -------- utils --------
 
-def _seed_to_namespace(seed: int) -> uuid.UUID:
+def _seed_to_namespace(seed: int) -> bytes:
+    # raw 16 bytes of the per-seed namespace UUID, ready to prefix uuid5 names
     h = hashlib.sha256(f"steampunk:{seed}".encode()).digest()
-    return uuid.UUID(bytes=h[:16])
+    return h[:16]
 
-def _uuid5_ns(seed_ns: uuid.UUID, name: str) -> str:
-    return str(uuid.uuid5(seed_ns, name))
+def _uuid5_ns(seed_ns: bytes, name: str) -> str:
+    # same value as str(uuid.uuid5(uuid.UUID(bytes=seed_ns), name)), without the UUID object round-trip
+    d = bytearray(hashlib.sha1(seed_ns + name.encode()).digest()[:16])
+    d[6] = (d[6] & 0x0F) | 0x50  # version 5
+    d[8] = (d[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = d.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
 
 def _rng(seed: int, stream: str) -> random.Random:
-    h = hashlib.sha256(f"{seed}:{stream}".encode()).hexdigest()
-    return random.Random(int(h[:16], 16))
+    h = hashlib.sha256(f"{seed}:{stream}".encode()).digest()
+    return random.Random(int.from_bytes(h[:8], "big"))
 
 # -------- config --------
 
-def _load_yaml(path: str) -> Dict[str, Any]:
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # libyaml not available
+    from yaml import SafeLoader as _YamlLoader
+
+
+@lru_cache(maxsize=8)
+def _parse_yaml(path: str, mtime_ns: int) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        cfg = yaml.load(f, Loader=_YamlLoader)
+    # derived lookups, built once per parsed config
+    ratios_index: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+    for r in cfg["ratios"]:
+        ratios_index.setdefault(tuple(r["key"]), r)
+    cfg["_ratios_index"] = ratios_index
+    return cfg
+
+def _load_yaml(path: str) -> Dict[str, Any]:
+    # parsed config is cached per (path, mtime); callers must treat it as read-only
+    return _parse_yaml(path, os.stat(path).st_mtime_ns)
 
 # -------- generator --------
 
@@ -68,11 +95,14 @@ def generate_chunk(config_path: str, seed: int, scope_type: str, scope_node_id:
 
     nodes: List[Dict[str, Any]] = []
     links: List[Dict[str, Any]] = []
+    # (node_type, parent_id) -> nodes and id -> node, both kept in sync with `nodes`
+    index: Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]] = {}
+    nodes_by_id: Dict[str, Dict[str, Any]] = {}
 
     # ---- helpers ----
     def add_node(node_type: str, name: str, parent_id: Optional[str], attrs: Dict[str, Any], slug: Optional[str] = None, fixed_id: Optional[str] = None) -> str:
         nid = fixed_id or _uuid5_ns(ns, f"{chunk_id}:{node_type}:{name}:{parent_id}")
-        nodes.append({
+        _append_node(nodes, index, nodes_by_id, {
             "id": nid,
             "node_type": node_type,
             "name": name,
@@ -83,17 +113,6 @@ def generate_chunk(config_path: str, seed: int, scope_type: str, scope_node_id:
         })
         return nid
 
-    def add_link(src_id: str, dst_id: str, link_type: str, weight: Optional[float] = None, attrs: Optional[Dict[str, Any]] = None):
-        lid = _uuid5_ns(ns, f"{chunk_id}:link:{src_id}:{dst_id}:{link_type}")
-        links.append({
-            "id": lid,
-            "src_id": src_id,
-            "dst_id": dst_id,
-            "link_type": link_type,
-            "weight": weight,
-            "attrs": attrs or {},
-        })
-
     # ---- build country + cities ----
     topo_rng = _rng(seed, cfg["random"]["streams"]["topology"])
     style_rng = _rng(seed, cfg["random"]["streams"]["style"])
@@ -131,10 +150,10 @@ def generate_chunk(config_path: str, seed: int, scope_type: str, scope_node_id:
                 "population_target": pop_rng.randint(worldp["city_size_range"][0], worldp["city_size_range"][1]),
             })
             city_ids.append(city_id)
-            _generate_city_contents(cfg, ns, chunk_id, city_id, buildings_cfg, style_rng, topo_rng, nodes)
+            _generate_city_contents(cfg, ns, chunk_id, city_id, buildings_cfg, style_rng, topo_rng, nodes, index, nodes_by_id)
         # generate NPCs and place them per city
         for city_id in city_ids:
-            _generate_npcs_for_city(cfg, ns, chunk_id, city_id, prof_by_cat, buildings_cfg, faction_by_id, pop_rng, factions_rng, place_rng, nodes, links)
+            _generate_npcs_for_city(cfg, ns, chunk_id, city_id, prof_by_cat, buildings_cfg, faction_by_id, pop_rng, factions_rng, place_rng, nodes, links, index, nodes_by_id)
 
         scope_node_id_out = country_node_id
 
@@ -147,17 +166,17 @@ def generate_chunk(config_path: str, seed: int, scope_type: str, scope_node_id:
             "density": topo_rng.choice(worldp["city_density_levels"]),
             "population_target": pop_rng.randint(worldp["city_size_range"][0], worldp["city_size_range"][1]),
         }, fixed_id=(scope_node_id or None))
-        _generate_city_contents(cfg, ns, chunk_id, city_node_id, buildings_cfg, style_rng, topo_rng, nodes)
-        _generate_npcs_for_city(cfg, ns, chunk_id, city_node_id, prof_by_cat, buildings_cfg, faction_by_id, pop_rng, factions_rng, place_rng, nodes, links)
+        _generate_city_contents(cfg, ns, chunk_id, city_node_id, buildings_cfg, style_rng, topo_rng, nodes, index, nodes_by_id)
+        _generate_npcs_for_city(cfg, ns, chunk_id, city_node_id, prof_by_cat, buildings_cfg, faction_by_id, pop_rng, factions_rng, place_rng, nodes, links, index, nodes_by_id)
         scope_node_id_out = city_node_id
 
     return {"chunk_id": chunk_id, "nodes": nodes, "links": links, "scope_node_id": scope_node_id_out}
 
 
-def _generate_city_contents(cfg: Dict[str, Any], ns: uuid.UUID, chunk_id: str, city_id: str, buildings_cfg: Dict[str, Dict[str, Any]], style_rng, topo_rng, nodes: List[Dict[str, Any]]):
+def _generate_city_contents(cfg: Dict[str, Any], ns: bytes, chunk_id: str, city_id: str, buildings_cfg: Dict[str, Dict[str, Any]], style_rng, topo_rng, nodes: List[Dict[str, Any]], index: Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]], nodes_by_id: Dict[str, Dict[str, Any]]):
     def add(node_type, name, parent, attrs, slug=None, fixed_id=None):
-        nid = str(uuid.uuid5(ns, f"{chunk_id}:{node_type}:{name}:{parent}")) if not fixed_id else fixed_id
-        nodes.append({"id": nid, "node_type": node_type, "name": name, "parent_id": parent, "slug": slug, "chunk_id": chunk_id, "attrs": attrs})
+        nid = _uuid5_ns(ns, f"{chunk_id}:{node_type}:{name}:{parent}") if not fixed_id else fixed_id
+        _append_node(nodes, index, nodes_by_id, {"id": nid, "node_type": node_type, "name": name, "parent_id": parent, "slug": slug, "chunk_id": chunk_id, "attrs": attrs})
         return nid
 
     # districts
@@ -187,15 +206,14 @@ def _generate_city_contents(cfg: Dict[str, Any], ns: uuid.UUID, chunk_id: str, c
 
     all_buildings = list(buildings_cfg.values())
 
-    built = 0
-    for (did, arch) in district_ids:
-        # baseline 5-20 buildings per district, then trimmed to per_city
-        b_target = topo_rng.randint(5, 20)
+    # spread per_city evenly over the districts (earlier districts take the remainder)
+    n_districts = len(district_ids)
+    counts = [per_city // n_districts + (1 if i < per_city % n_districts else 0) for i in range(n_districts)]
+    for (did, arch), k in zip(district_ids, counts):
         candidates = [b for b in all_buildings if arch["id"] in b.get("preferred_districts", [])]
         if not candidates:
             candidates = all_buildings
-        for j in range(b_target):
-            bcfg = topo_rng.choice(candidates)
+        for j, bcfg in enumerate(topo_rng.choices(candidates, k=k)):
             bname = bcfg["id"].replace("_", " ").title() + f" {j+1}"
             cap = int(round(bcfg["base_capacity"] * topo_rng.uniform(0.9, 1.1)))
             add("building", bname, did, {
@@ -203,22 +221,15 @@ def _generate_city_contents(cfg: Dict[str, Any], ns: uuid.UUID, chunk_id: str, c
                 "capacity": cap,
                 "tags": bcfg.get("tags", []),
             })
-            built += 1
-            if built >= per_city:
-                break
-        if built >= per_city:
-            break
 
     # floors/rooms omitted for brevity; can be expanded later
 
 
-def _collect_city_snapshot(nodes: List[Dict[str, Any]], city_id: str) -> Dict[str, Any]:
-    # Build lookups
-    districts = [n for n in nodes if n["node_type"] == "district" and n["parent_id"] == city_id]
-    buildings = [n for n in nodes if n["node_type"] == "building" and n["parent_id"] in {d["id"] for d in districts}]
-    by_district: Dict[str, List[Dict[str, Any]]] = {d["id"]: [] for d in districts}
-    for b in buildings:
-        by_district[b["parent_id"]].append(b)
+def _collect_city_snapshot(index: Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]], city_id: str) -> Dict[str, Any]:
+    # Build lookups from the (node_type, parent_id) index
+    districts = list(index.get(("district", city_id), []))
+    by_district: Dict[str, List[Dict[str, Any]]] = {d["id"]: list(index.get(("building", d["id"]), [])) for d in districts}
+    buildings = [b for bs in by_district.values() for b in bs]
     facility_tags = set()
     for b in buildings:
         for t in b["attrs"].get("tags", []):
@@ -231,22 +242,19 @@ def _collect_city_snapshot(nodes: List[Dict[str, Any]], city_id: str) -> Dict[st
     }
 
 
-def _generate_npcs_for_city(cfg: Dict[str, Any], ns: uuid.UUID, chunk_id: str, city_id: str, prof_by_cat: Dict[str, List[Dict[str, Any]]], buildings_cfg: Dict[str, Dict[str, Any]], faction_by_id: Dict[str, Any], pop_rng, factions_rng, place_rng, nodes: List[Dict[str, Any]], links: List[Dict[str, Any]]):
+def _generate_npcs_for_city(cfg: Dict[str, Any], ns: bytes, chunk_id: str, city_id: str, prof_by_cat: Dict[str, List[Dict[str, Any]]], buildings_cfg: Dict[str, Dict[str, Any]], faction_by_id: Dict[str, Any], pop_rng, factions_rng, place_rng, nodes: List[Dict[str, Any]], links: List[Dict[str, Any]], index: Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]], nodes_by_id: Dict[str, Dict[str, Any]]):
     # compute city attrs
-    city_node = next(n for n in nodes if n["id"] == city_id)
+    city_node = nodes_by_id[city_id]
     dom_ind = city_node["attrs"]["dominant_industry"]
     wealth = city_node["attrs"]["wealth"]
     pop_target = int(city_node["attrs"]["population_target"])
 
     # ratios lookup
-    ratios_entries = cfg["ratios"]
-    ratio = next((r for r in ratios_entries if r["key"] == [dom_ind, wealth]), None)
-    if not ratio:
-        ratio = ratios_entries[0]
+    ratio = cfg["_ratios_index"].get((dom_ind, wealth)) or cfg["ratios"][0]
     cat_shares = ratio["categories"]
 
     # collect city snapshot
-    snap = _collect_city_snapshot(nodes, city_id)
+    snap = _collect_city_snapshot(index, city_id)
 
     # filter professions by available facilities
     allowed_profs_by_cat: Dict[str, List[Dict[str, Any]]] = {}
@@ -274,50 +282,60 @@ def _generate_npcs_for_city(cfg: Dict[str, Any], ns: uuid.UUID, chunk_id: str, c
     # placement prep
     buildings = snap["buildings"]
     by_district = snap["by_district"]
+    building_by_id: Dict[str, Dict[str, Any]] = {b["id"]: b for b in buildings}
     capacity_left = {b["id"]: int(b["attrs"].get("capacity", 0)) for b in buildings}
-    prof_in_district: Dict[Tuple[str, str], int] = {}
+    # district -> profession -> placed count, plus running per-district totals
+    prof_in_district: Dict[str, Counter] = defaultdict(Counter)
+    district_total: Dict[str, int] = defaultdict(int)
 
     diversity_pct = cfg["placement_rules"]["diversity"]["max_same_profession_pct_per_district"]
     overflow_type = cfg["placement_rules"]["failsafe"]["overflow_building"]
+    faction_node_ids: Dict[str, str] = {fid: _uuid_faction(ns, chunk_id, fid) for fid in faction_by_id}
 
-    # make a quick lookup for buildings by tags and by district
-    buildings_by_tag: Dict[str, List[Dict[str, Any]]] = {}
-    for b in buildings:
-        for t in b["attrs"].get("tags", []):
-            buildings_by_tag.setdefault(t, []).append(b)
-
-    def add_node_local(node_type: str, name: str, parent_id: Optional[str], attrs: Dict[str, Any]):
-        nid = str(uuid.uuid5(ns, f"{chunk_id}:{node_type}:{name}:{parent_id}"))
-        nodes.append({"id": nid, "node_type": node_type, "name": name, "parent_id": parent_id, "slug": None, "chunk_id": chunk_id, "attrs": attrs})
-        return nid
-
-    def place_in_building(p: Dict[str, Any], district_pref: List[str]) -> Optional[str]:
-        # Try preferred districts first
-        allowed_tags = set(p.get("allowed_building_tags", []))
-        candidate_buildings = [b for b in buildings if allowed_tags & set(b["attrs"].get("tags", []))]
-        # Bias by district preferences
+    # tag sets per building and per district, computed once per city
+    building_tag_sets: Dict[str, frozenset] = {b["id"]: frozenset(b["attrs"].get("tags", [])) for b in buildings}
+    district_tags: Dict[str, frozenset] = {
+        did: frozenset().union(*(building_tag_sets[b["id"]] for b in bs)) for did, bs in by_district.items()
+    }
+    # candidates only depend on the profession and its district preferences
+    candidates_cache: Dict[Tuple[str, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+
+    def candidate_buildings_for(p: Dict[str, Any], allowed_tags: Set[str], district_pref: List[str]) -> List[Dict[str, Any]]:
+        key = (p["id"], tuple(district_pref))
+        cached = candidates_cache.get(key)
+        if cached is not None:
+            return cached
+        candidates = [b for b in buildings if allowed_tags & building_tag_sets[b["id"]]]
+        # Bias by district preferences: preferred districts first, original order kept
         if district_pref:
-            candidate_buildings.sort(key=lambda b: 0 if any(_district_name(b["parent_id"]) in district_pref or _district_arch(b["parent_id"]) in district_pref else 1)
-                                     )
-        # Try to keep diversity per district
-        for b in candidate_buildings:
+            preferred, others = [], []
+            for b in candidates:
+                d = b["parent_id"]
+                (preferred if _district_name(d) in district_pref or _district_arch(d) in district_pref else others).append(b)
+            candidates = preferred + others
+        candidates_cache[key] = candidates
+        return candidates
+
+    def place_in_building(p: Dict[str, Any], allowed_tags: Set[str], district_pref: List[str]) -> Optional[str]:
+        # Try preferred districts first, keeping diversity per district
+        for b in candidate_buildings_for(p, allowed_tags, district_pref):
             if capacity_left.get(b["id"], 0) <= 0:
                 continue
             d = b["parent_id"]
-            key = (d, p["id"])  # district, profession
-            cur = prof_in_district.get(key, 0)
-            total_in_d = sum(v for (dd, _), v in prof_in_district.items() if dd == d) or 1
+            cur = prof_in_district[d][p["id"]]
+            total_in_d = district_total[d] or 1
             if (cur + 1) / total_in_d > diversity_pct and total_in_d > 5:
                 continue
             capacity_left[b["id"]] -= 1
-            prof_in_district[key] = cur + 1
+            prof_in_district[d][p["id"]] = cur + 1
+            district_total[d] += 1
             return b["id"]
         # overflow
         ob = next((b for b in buildings if b["attrs"].get("building_id") == overflow_type and capacity_left.get(b["id"], 0) > 0), None)
         if ob:
             capacity_left[ob["id"]] -= 1
-            key = (ob["parent_id"], p["id"])  # still track
-            prof_in_district[key] = prof_in_district.get(key, 0) + 1
+            prof_in_district[ob["parent_id"]][p["id"]] += 1  # still track
+            district_total[ob["parent_id"]] += 1
             return ob["id"]
         return None
 
@@ -332,12 +350,14 @@ def _generate_npcs_for_city(cfg: Dict[str, Any], ns: uuid.UUID, chunk_id: str, c
         return _district_cache_arch.get(did, "")
 
     # generate faction membership weights per district
-    def faction_for(npc_cat: str, did: str) -> Optional[str]:
+    # (category, district) -> (faction ids, cumulative weights, total); weights are static per city
+    faction_weights: Dict[Tuple[str, str], Optional[Tuple[List[str], List[float], float]]] = {}
+
+    def _faction_weights(npc_cat: str, did: str) -> Optional[Tuple[List[str], List[float], float]]:
         # compute weights from cfg influence
-        weights: List[Tuple[str, float]] = []
-        tags = set()
-        for b in by_district.get(did, []):
-            tags.update(b["attrs"].get("tags", []))
+        fids: List[str] = []
+        weights: List[float] = []
+        tags = district_tags.get(did, frozenset())
         for fid, f in faction_by_id.items():
             if npc_cat not in f.get("admits_categories", []):
                 continue
@@ -346,38 +366,49 @@ def _generate_npcs_for_city(cfg: Dict[str, Any], ns: uuid.UUID, chunk_id: str, c
             for t in tags:
                 w += float(f.get("influence", {}).get("district_tags", {}).get(t, 0.0))
             if w > 0:
-                weights.append((fid, w))
+                fids.append(fid)
+                weights.append(w)
         if not weights:
             return None
-        total = sum(w for _, w in weights)
-        pick = factions_rng.random() * total
-        acc = 0.0
-        for fid, w in weights:
-            acc += w
-            if pick <= acc:
-                return fid
-        return weights[-1][0]
+        return fids, list(accumulate(weights)), sum(weights)
+
+    def faction_for(npc_cat: str, did: str) -> Optional[str]:
+        key = (npc_cat, did)
+        if key not in faction_weights:
+            faction_weights[key] = _faction_weights(npc_cat, did)
+        entry = faction_weights[key]
+        if entry is None:
+            return None
+        fids, cum_weights, total = entry
+        i = bisect_left(cum_weights, factions_rng.random() * total)
+        return fids[min(i, len(fids) - 1)]
 
     # create NPCs
     name_given = cfg["world_params"]["name_pools"]["given_names"]
     name_surn = cfg["world_params"]["name_pools"]["surnames"]
+    # draw every NPC name for the city up front, one C-level call per pool
+    total_npcs = sum(prof_counts.values())
+    givens = pop_rng.choices(name_given, k=total_npcs)
+    surns = pop_rng.choices(name_surn, k=total_npcs)
+
+    prof_by_id = {pp["id"]: pp for lst in prof_by_cat.values() for pp in lst}
 
     created = 0
     for prof_id, count in prof_counts.items():
-        p = next(pp for pp in sum(prof_by_cat.values(), []) if pp["id"] == prof_id)
+        p = prof_by_id[prof_id]
         cat = p["category"]
+        allowed_tags = set(p.get("allowed_building_tags", []))
+        district_pref = p.get("preferred_districts", [])
         for i in range(count):
-            g = pop_rng.choice(name_given)
-            s = pop_rng.choice(name_surn)
-            npc_name = f"{g} {s}"
+            npc_name = f"{givens[created]} {surns[created]}"
             # place
-            b_id = place_in_building(p, p.get("preferred_districts", []))
+            b_id = place_in_building(p, allowed_tags, district_pref)
             if not b_id and cfg["placement_rules"]["failsafe"]["create_overflow_if_missing"]:
                 # create overflow building in a random district
                 any_d = next(iter(by_district.keys()))
                 ob_name = "Boarding House Overflow"
                 ob_node = {
-                    "id": str(uuid.uuid5(ns, f"{chunk_id}:building:{ob_name}:{any_d}")),
+                    "id": _uuid5_ns(ns, f"{chunk_id}:building:{ob_name}:{any_d}"),
                     "node_type": "building",
                     "name": ob_name,
                     "parent_id": any_d,
@@ -385,13 +416,14 @@ def _generate_npcs_for_city(cfg: Dict[str, Any], ns: uuid.UUID, chunk_id: str, c
                     "chunk_id": chunk_id,
                     "attrs": {"building_id": cfg["placement_rules"]["failsafe"]["overflow_building"], "capacity": 100, "tags": ["residential", "overflow"]}
                 }
-                nodes.append(ob_node)
+                _append_node(nodes, index, nodes_by_id, ob_node)
                 capacity_left[ob_node["id"]] = 100
                 b_id = ob_node["id"]
             # create npc node regardless, but parent is building if available
-            npc_id = str(uuid.uuid5(ns, f"{chunk_id}:npc:{npc_name}:{b_id or city_id}"))
-            faction_id = faction_for(cat, next((b["parent_id"] for b in buildings if b["id"] == b_id), city_id)) if b_id else None
-            nodes.append({
+            npc_id = _uuid5_ns(ns, f"{chunk_id}:npc:{npc_name}:{b_id or city_id}")
+            b = building_by_id.get(b_id) if b_id else None
+            faction_id = faction_for(cat, b["parent_id"] if b else city_id) if b_id else None
+            npc_node = {
                 "id": npc_id,
                 "node_type": "npc",
                 "name": npc_name,
@@ -399,16 +431,16 @@ def _generate_npcs_for_city(cfg: Dict[str, Any], ns: uuid.UUID, chunk_id: str, c
                 "slug": None,
                 "chunk_id": chunk_id,
                 "attrs": {"profession": prof_id, "category": cat, "faction_id": faction_id}
-            })
+            }
+            _append_node(nodes, index, nodes_by_id, npc_node)
             if faction_id:
-                _add_link(ns, chunk_id, npc_id, _uuid_faction(ns, chunk_id, faction_id), "member_of", 0.8, None, links)
+                _add_link(ns, chunk_id, npc_id, faction_node_ids[faction_id], "member_of", 0.8, None, links)
             created += 1
 
     # ensure faction nodes exist
-    for fid in faction_by_id.keys():
-        fnid = _uuid_faction(ns, chunk_id, fid)
-        if not any(n for n in nodes if n["id"] == fnid):
-            nodes.append({
+    for fid, fnid in faction_node_ids.items():
+        if fnid not in nodes_by_id:
+            faction_node = {
                 "id": fnid,
                 "node_type": "faction",
                 "name": fid.replace("_", " ").title(),
@@ -416,14 +448,20 @@ def _generate_npcs_for_city(cfg: Dict[str, Any], ns: uuid.UUID, chunk_id: str, c
                 "slug": None,
                 "chunk_id": chunk_id,
                 "attrs": {"id": fid}
-            })
+            }
+            _append_node(nodes, index, nodes_by_id, faction_node)
 
     # attach created nodes/links back to caller
     # (they reference the global lists)
 
-def _add_link(ns: uuid.UUID, chunk_id: str, src_id: str, dst_id: str, link_type: str, weight: Optional[float], attrs: Optional[Dict[str, Any]], links: List[Dict[str, Any]]):
-    lid = str(uuid.uuid5(ns, f"{chunk_id}:link:{src_id}:{dst_id}:{link_type}"))
+def _append_node(nodes: List[Dict[str, Any]], index: Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]], nodes_by_id: Dict[str, Dict[str, Any]], node: Dict[str, Any]):
+    nodes.append(node)
+    nodes_by_id[node["id"]] = node
+    index.setdefault((node["node_type"], node["parent_id"]), []).append(node)
+
+def _add_link(ns: bytes, chunk_id: str, src_id: str, dst_id: str, link_type: str, weight: Optional[float], attrs: Optional[Dict[str, Any]], links: List[Dict[str, Any]]):
+    lid = _uuid5_ns(ns, f"{chunk_id}:link:{src_id}:{dst_id}:{link_type}")
     links.append({"id": lid, "src_id": src_id, "dst_id": dst_id, "link_type": link_type, "weight": weight, "attrs": attrs or {}})
 
-def _uuid_faction(ns: uuid.UUID, chunk_id: str, fid: str) -> str:
-    return str(uuid.uuid5(ns, f"{chunk_id}:faction:{fid}"))
+def _uuid_faction(ns: bytes, chunk_id: str, fid: str) -> str:
+    return _uuid5_ns(ns, f"{chunk_id}:faction:{fid}")
@@ -13,6 +13,9 @@ CREATE TABLE IF NOT EXISTS nodes (
 CREATE INDEX IF NOT EXISTS idx_nodes_parent ON nodes(parent_id);
 CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes(node_type);
 CREATE INDEX IF NOT EXISTS idx_nodes_chunk ON nodes(chunk_id);
+-- chunk stats: per-type counts and the links join are answered by index-only scans.
+-- On a live database build it with CREATE INDEX CONCURRENTLY (outside a transaction).
+CREATE INDEX IF NOT EXISTS idx_nodes_chunk_type ON nodes(chunk_id, node_type) INCLUDE (id);
 CREATE INDEX IF NOT EXISTS idx_nodes_gin ON nodes USING GIN (attrs);
 
 CREATE TABLE IF NOT EXISTS links (
@@ -1,11 +1,75 @@
-import json
 import os
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
+from PySide6.QtCore import QEvent, QObject, QRunnable, QThreadPool, QTimer, Signal, Slot
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QTextEdit, QFileDialog, QMessageBox
 
-CONFIG_PATH = Path(__file__).resolve().parents[1] / "config.json"
+try:
+    import orjson
+
+    def _loads(raw):
+        return orjson.loads(raw)
+
+    def _pretty(data) -> str:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+except ImportError:  # orjson not installed, fall back to the stdlib
+    import json
+
+    def _loads(raw):
+        return json.loads(raw)
+
+    def _pretty(data) -> str:
+        return json.dumps(data, indent=2)
+
+APP_DIR = Path(__file__).resolve().parents[1]
+CONFIG_PATH = APP_DIR / "config.json"
+EXAMPLE_PATH = APP_DIR / "config.example.json"
+_CHUNK_ID_RE = re.compile(rb'"chunk_id"\s*:\s*"([^"]+)"')
+
+
+@lru_cache(maxsize=8)
+def _read_cfg(path_str: str, mtime_ns: int):
+    return _loads(Path(path_str).read_bytes())
+
+
+def _load_cfg_file(path: Path):
+    # parsed once per (path, mtime); a modified file gets a new cache key
+    return _read_cfg(str(path), path.stat().st_mtime_ns)
+
+
+class _HttpSignals(QObject):
+    finished = Signal(bool, object)  # ok, (parsed JSON, display text) or the exception
+
+
+class HttpWorker(QRunnable):
+    """Runs one request on the shared session in a pool thread and reports back via a signal.
+
+    The response is parsed and pretty-printed here too, so the GUI thread only sets the text.
+    """
+
+    def __init__(self, session: requests.Session, method: str, url: str, **kwargs):
+        super().__init__()
+        self.session = session
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self.signals = _HttpSignals()
+
+    def run(self):
+        try:
+            r = self.session.request(self.method, self.url, **self.kwargs)
+            r.raise_for_status()
+            data = _loads(r.content)
+            text = _pretty(data)
+        except Exception as e:
+            self.signals.finished.emit(False, e)
+            return
+        self.signals.finished.emit(True, (data, text))
+
 
 class App(QWidget):
     def __init__(self):
@@ -13,6 +77,9 @@ class App(QWidget):
         self.setWindowTitle("World Editor - Steampunk Generator")
         self.resize(680, 520)
         self.txt = QTextEdit(self)
+        # JSON only: skip rich-text detection and undo history on large inserts
+        self.txt.setAcceptRichText(False)
+        self.txt.document().setUndoRedoEnabled(False)
         self.btn_gen = QPushButton("Générer Chunk", self)
         self.btn_stats = QPushButton("Voir Stats Chunk", self)
         self.btn_load_cfg = QPushButton("Charger config.json", self)
@@ -21,58 +88,125 @@ class App(QWidget):
         lay.addWidget(self.btn_gen)
         lay.addWidget(self.btn_stats)
         lay.addWidget(self.txt)
+        # one keep-alive session for every API call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": "WorldEditor/1.0"})
+        self._last_response = None
+        # in-flight workers, kept referenced until their signal is delivered
+        self._gen_worker = None
+        self._stats_worker = None
+        self._warmup_worker = None
+        self._pending_text = None
+        self._last_dir = APP_DIR
         self.cfg = self._load_cfg()
+        self._rebuild_cfg_derived()
         self.btn_gen.clicked.connect(self.on_generate)
         self.btn_stats.clicked.connect(self.on_stats)
         self.btn_load_cfg.clicked.connect(self.on_load)
+        QTimer.singleShot(0, self._warmup)
 
     def _load_cfg(self):
         if CONFIG_PATH.exists():
-            return json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
+            return _load_cfg_file(CONFIG_PATH)
         # default example
-        example = Path(__file__).resolve().parents[1] / "config.example.json"
-        return json.loads(example.read_text(encoding="utf-8"))
+        return _load_cfg_file(EXAMPLE_PATH)
 
     def on_load(self):
-        p, _ = QFileDialog.getOpenFileName(self, "Choisir config.json", str(Path.cwd()), "JSON (*.json)")
+        p, _ = QFileDialog.getOpenFileName(self, "Choisir config.json", str(self._last_dir), "JSON (*.json)")
         if p:
-            with open(p, "r", encoding="utf-8") as f:
-                self.cfg = json.load(f)
+            self.cfg = _load_cfg_file(Path(p))
+            self._last_dir = Path(p).parent
+            self._rebuild_cfg_derived()
+            self._warmup()
             QMessageBox.information(self, "Config", "Config chargée.")
 
-    def _headers(self):
-        key = self.cfg["api"].get("api_key")
-        return {"x-api-key": key} if key else {}
+    def _rebuild_cfg_derived(self):
+        # everything the click handlers need from the config, computed once per load
+        api = self.cfg["api"]
+        self._base = api["base_url"].rstrip("/")
+        self._generate_url = f"{self._base}/api/generate/chunk"
+        if key := api.get("api_key"):
+            self.session.headers["x-api-key"] = key
+        else:
+            self.session.headers.pop("x-api-key", None)
 
-    def on_generate(self):
-        base = self.cfg["api"]["base_url"].rstrip("/")
-        body = self.cfg["generator"]
+    def _warmup(self):
+        # open (and TLS-handshake) the pooled connection before the first click; result is ignored
+        self._warmup_worker = HttpWorker(self.session, "GET", f"{self._base}/health", timeout=5)
+        QThreadPool.globalInstance().start(self._warmup_worker)
+
+    def _show_text(self, text: str):
+        if not self.isVisible() or self.isMinimized():
+            # nobody can see it: keep only the latest text until the window is shown again
+            self._pending_text = text
+            return
+        self._pending_text = None
+        # one repaint after the whole document is replaced
+        self.txt.setUpdatesEnabled(False)
         try:
-            r = requests.post(f"{base}/api/generate/chunk", json=body, headers=self._headers(), timeout=60)
-            r.raise_for_status()
-            data = r.json()
-            self.txt.setText(json.dumps(data, indent=2))
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", str(e))
+            self.txt.setPlainText(text)
+        finally:
+            self.txt.setUpdatesEnabled(True)
+
+    def _flush_pending_text(self):
+        if self._pending_text is not None:
+            self._show_text(self._pending_text)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._flush_pending_text()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._flush_pending_text()
+
+    def closeEvent(self, event):
+        self.session.close()
+        super().closeEvent(event)
+
+    def on_generate(self):
+        self.btn_gen.setEnabled(False)
+        self._gen_worker = HttpWorker(self.session, "POST", self._generate_url, json=self.cfg["generator"], timeout=60)
+        self._gen_worker.signals.finished.connect(self._on_generate_done)
+        QThreadPool.globalInstance().start(self._gen_worker)
+
+    @Slot(bool, object)
+    def _on_generate_done(self, ok, payload):
+        self._gen_worker = None
+        self.btn_gen.setEnabled(True)
+        if not ok:
+            QMessageBox.critical(self, "Erreur", str(payload))
+            return
+        self._last_response, text = payload
+        self._show_text(text)
 
     def on_stats(self):
-        base = self.cfg["api"]["base_url"].rstrip("/")
-        chunk_id = None
-        try:
-            last = json.loads(self.txt.toPlainText() or "{}")
-            chunk_id = last.get("chunk_id")
-        except Exception:
-            pass
+        chunk_id = (self._last_response or {}).get("chunk_id")
+        if not chunk_id:
+            # nothing generated this session: look for an id pasted at the top of the pane
+            m = _CHUNK_ID_RE.search(self.txt.toPlainText()[:256].encode())
+            chunk_id = m.group(1).decode() if m else None
         if not chunk_id:
             QMessageBox.warning(self, "Stats", "Aucun chunk_id (générez d'abord)")
             return
-        try:
-            r = requests.get(f"{base}/api/chunks/{chunk_id}/stats", headers=self._headers(), timeout=30)
-            r.raise_for_status()
-            data = r.json()
-            self.txt.setText(json.dumps(data, indent=2))
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", str(e))
+        self.btn_stats.setEnabled(False)
+        self._stats_worker = HttpWorker(self.session, "GET", f"{self._base}/api/chunks/{chunk_id}/stats", timeout=30)
+        self._stats_worker.signals.finished.connect(self._on_stats_done)
+        QThreadPool.globalInstance().start(self._stats_worker)
+
+    @Slot(bool, object)
+    def _on_stats_done(self, ok, payload):
+        self._stats_worker = None
+        self.btn_stats.setEnabled(True)
+        if not ok:
+            QMessageBox.critical(self, "Erreur", str(payload))
+            return
+        _, text = payload
+        self._show_text(text)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)